@@ -28,4 +28,10 @@ setup(
     install_requires=[
         "aiohttp>=3.8.0",
     ],
+    extras_require={
+        "speedups": [
+            "orjson>=3.6.0",
+            "uvloop>=0.17.0; sys_platform != 'win32'",
+        ],
+    },
 )
@@ -2,6 +2,8 @@ import aiohttp
 import asyncio
 import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Callable, Dict, List, Any, Optional, Union
 
 from .handlers import HandlerManager, MessageHandler, EventHandler, message_handler, event_handler
@@ -15,6 +17,11 @@ class VKgramBot:
     VKgramBot - Complete async VK bot library
     """
     
+    # HTTP sessions shared by all started bots on the same event loop,
+    # with the number of bots using each; the last bot to close() closes it
+    _shared_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+    _session_users: Dict[asyncio.AbstractEventLoop, int] = {}
+    
     def __init__(
         self, 
         token: str,
@@ -48,9 +55,45 @@ class VKgramBot:
         # Auto-register handlers from decorators
         self._auto_handlers = []
         
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
+    @classmethod
+    def enable_default_logging(
+        cls,
+        level: int = logging.INFO,
+        use_queue: bool = False
+    ) -> Optional[QueueListener]:
+        """Configure root logging for scripts that don't set it up themselves
+        
+        With ``use_queue`` records are written by a background thread, so
+        slow log output never blocks the event loop. The started listener
+        is returned and should be stopped on shutdown.
+        """
+        if not use_queue:
+            logging.basicConfig(level=level)
+            return None
+        
+        # QueueHandler formats records, the listener thread only writes them
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, logging.StreamHandler())
+        logging.basicConfig(level=level, handlers=[QueueHandler(log_queue)])
+        listener.start()
+        return listener
+    
+    @staticmethod
+    def use_uvloop() -> bool:
+        """Install uvloop event loop policy if uvloop is available
+        
+        Must be called before the event loop is created.
+        """
+        try:
+            import uvloop
+        except ImportError:
+            return False
+        
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return True
+    
     def message_handler(self, *filters: Filter):
         """Decorator for message handlers"""
         def decorator(func: Callable) -> Callable:
@@ -67,10 +110,54 @@ class VKgramBot:
             return func
         return decorator
     
+    @classmethod
+    def _acquire_shared_session(cls) -> aiohttp.ClientSession:
+        """Get the keep-alive session shared by bots on the running loop
+        
+        Every call must be paired with _release_shared_session.
+        """
+        loop = asyncio.get_running_loop()
+        session = cls._shared_sessions.get(loop)
+        
+        if session is None or session.closed:
+            # Only api.vk.com and the Long Poll host are contacted, so keep
+            # plenty of warm connections per host and cache DNS lookups
+            connector = aiohttp.TCPConnector(
+                limit=300,
+                limit_per_host=100,
+                ttl_dns_cache=600,
+                keepalive_timeout=60,
+                enable_cleanup_closed=True,
+                force_close=False
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=30, sock_connect=10)
+            )
+            cls._shared_sessions[loop] = session
+        
+        cls._session_users[loop] = cls._session_users.get(loop, 0) + 1
+        return session
+    
+    @classmethod
+    async def _release_shared_session(cls):
+        """Close the shared session once no bot on the running loop uses it"""
+        loop = asyncio.get_running_loop()
+        users = cls._session_users.get(loop, 0) - 1
+        if users > 0:
+            cls._session_users[loop] = users
+            return
+        
+        cls._session_users.pop(loop, None)
+        session = cls._shared_sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+    
     async def start(self):
         """Start VKgram bot"""
-        self.connector = aiohttp.TCPConnector(limit=100, limit_per_host=20)
-        self.session = aiohttp.ClientSession(connector=self.connector)
+        if self.session is None:
+            self.session = self._acquire_shared_session()
+            self.connector = self.session.connector
         
         # Register auto-handlers
         for handler_type, handler in self._auto_handlers:
@@ -84,6 +171,18 @@ class VKgramBot:
         
         self.logger.info("🚀 VKgram bot started successfully")
     
+    async def close(self):
+        """Stop using the shared HTTP session
+        
+        The session is closed when the last bot on this event loop closes.
+        """
+        if self.session is None:
+            return
+        
+        self.session = None
+        self.connector = None
+        await self._release_shared_session()
+    
     # ... (rest of the bot implementation remains similar but uses handler_manager)
     
     async def _process_update(self, update: Dict[str, Any]):
@@ -94,6 +193,12 @@ class VKgramBot:
         
         if update_type == 'message_new':
             message_data = update['object']['message']
+            
+            # Skip building a Message when no handler can match its text
+            candidates = self.handler_manager.message_candidates(message_data.get('text') or '')
+            if not candidates:
+                return
+            
             message = Message(
                 id=message_data['id'],
                 from_id=message_data['from_id'],
@@ -103,7 +208,10 @@ class VKgramBot:
                 attachments=message_data.get('attachments', []),
                 payload=message_data.get('payload')
             )
-            await self.handler_manager.process_message(message, self)
+            # Route synchronously so unmatched messages never await
+            handlers = self.handler_manager.match_message(message, self, candidates)
+            if handlers:
+                await self.handler_manager.process_message(message, self, handlers)
         
         else:
             update_obj = Update(
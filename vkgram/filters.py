@@ -1,32 +1,54 @@
-from typing import Union, Any, List, Pattern
+from typing import Union, Any, List, Optional, Pattern
 import re
-from abc import ABC, abstractmethod
+from abc import ABC
 from .types import Message, Update
 
+def parse_command(text: str) -> Optional[str]:
+    """Extract lowercased command name from message text"""
+    if text[:1] != '/':
+        return None
+    # Split off the first word only, then remove '/'
+    return text.split(None, 1)[0][1:].lower()
+
 class Filter(ABC):
-    """Abstract base class for all filters"""
+    """Abstract base class for all filters
+    
+    Subclasses implement check_sync, or check for filters that must await.
+    """
+    
+    def __new__(cls, *args, **kwargs):
+        if cls.check is Filter.check and cls.check_sync is Filter.check_sync:
+            raise TypeError(
+                f"Can't instantiate filter {cls.__name__} without check or check_sync"
+            )
+        return super().__new__(cls)
+    
+    @property
+    def is_sync(self) -> bool:
+        """True if the filter can be evaluated without awaiting"""
+        return type(self).check is Filter.check
+    
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
+        """Check if update passes the filter without awaiting"""
+        raise NotImplementedError
     
-    @abstractmethod
     async def check(self, update: Union[Message, Update], bot: Any) -> bool:
         """Check if update passes the filter"""
-        pass
+        return self.check_sync(update, bot)
 
 class CommandFilter(Filter):
     """Filter for bot commands"""
     
     def __init__(self, commands: Union[str, List[str]]):
         self.commands = [commands] if isinstance(commands, str) else commands
+        self._commands = frozenset(cmd.lower() for cmd in self.commands)
     
-    async def check(self, update: Union[Message, Update], bot: Any) -> bool:
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
         if not isinstance(update, Message):
             return False
         
-        text = update.text or ""
-        if not text.startswith('/'):
-            return False
-        
-        command = text.split()[0][1:].lower()  # Remove '/' and get first word
-        return command in [cmd.lower() for cmd in self.commands]
+        command = parse_command(update.text or "")
+        return command is not None and command in self._commands
 
 class TextFilter(Filter):
     """Filter for message text"""
@@ -34,23 +56,28 @@ class TextFilter(Filter):
     def __init__(self, text: Union[str, List[str], Pattern], ignore_case: bool = True):
         self.text = text
         self.ignore_case = ignore_case
+        self._pattern = self._compile(text, ignore_case)
     
-    async def check(self, update: Union[Message, Update], bot: Any) -> bool:
-        if not isinstance(update, Message):
-            return False
-        
-        message_text = update.text or ""
-        
-        if isinstance(self.text, Pattern):
-            return bool(self.text.search(message_text))
+    @staticmethod
+    def _compile(text: Union[str, List[str], Pattern], ignore_case: bool) -> Optional[Pattern]:
+        """Compile substrings into a single alternation pattern"""
+        if isinstance(text, Pattern):
+            return text
         
-        texts = [self.text] if isinstance(self.text, str) else self.text
+        texts = [text] if isinstance(text, str) else text
+        if not texts:
+            return None
         
-        if self.ignore_case:
-            message_text = message_text.lower()
-            texts = [text.lower() for text in texts]
+        return re.compile(
+            '|'.join(map(re.escape, texts)),
+            re.IGNORECASE if ignore_case else 0
+        )
+    
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
+        if not isinstance(update, Message) or self._pattern is None:
+            return False
         
-        return any(text in message_text for text in texts)
+        return self._pattern.search(update.text or "") is not None
 
 class StateFilter(Filter):
     """Filter for user state"""
@@ -69,7 +96,7 @@ class ChatTypeFilter(Filter):
     def __init__(self, chat_type: str):
         self.chat_type = chat_type
     
-    async def check(self, update: Union[Message, Update], bot: Any) -> bool:
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
         if not isinstance(update, Message):
             return False
         
@@ -85,7 +112,7 @@ class UserFilter(Filter):
     def __init__(self, user_ids: Union[int, List[int]]):
         self.user_ids = [user_ids] if isinstance(user_ids, int) else user_ids
     
-    async def check(self, update: Union[Message, Update], bot: Any) -> bool:
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
         if isinstance(update, Message):
             return update.from_id in self.user_ids
         return False
@@ -96,7 +123,7 @@ class ContentTypeFilter(Filter):
     def __init__(self, content_type: str):
         self.content_type = content_type
     
-    async def check(self, update: Union[Message, Update], bot: Any) -> bool:
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
         if not isinstance(update, Message):
             return False
         
@@ -104,10 +131,8 @@ class ContentTypeFilter(Filter):
             return bool(update.text and update.text.strip())
         elif self.content_type == "attachment":
             return bool(update.attachments)
-        elif self.content_type == "sticker":
-            return any(att.get('type') == 'sticker' for att in update.attachments)
-        elif self.content_type == "photo":
-            return any(att.get('type') == 'photo' for att in update.attachments)
+        elif self.content_type in ("sticker", "photo"):
+            return self.content_type in update.attachment_types
         
         return False
 
@@ -118,8 +143,18 @@ class AndFilter(Filter):
     def __init__(self, *filters: Filter):
         self.filters = filters
     
+    @property
+    def is_sync(self) -> bool:
+        return all(filter_obj.is_sync for filter_obj in self.filters)
+    
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
+        return all(filter_obj.check_sync(update, bot) for filter_obj in self.filters)
+    
     async def check(self, update: Union[Message, Update], bot: Any) -> bool:
-        return all(await filter_obj.check(update, bot) for filter_obj in self.filters)
+        for filter_obj in self.filters:
+            if not await filter_obj.check(update, bot):
+                return False
+        return True
 
 class OrFilter(Filter):
     """Logical OR for filters"""
@@ -127,8 +162,18 @@ class OrFilter(Filter):
     def __init__(self, *filters: Filter):
         self.filters = filters
     
+    @property
+    def is_sync(self) -> bool:
+        return all(filter_obj.is_sync for filter_obj in self.filters)
+    
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
+        return any(filter_obj.check_sync(update, bot) for filter_obj in self.filters)
+    
     async def check(self, update: Union[Message, Update], bot: Any) -> bool:
-        return any(await filter_obj.check(update, bot) for filter_obj in self.filters)
+        for filter_obj in self.filters:
+            if await filter_obj.check(update, bot):
+                return True
+        return False
 
 class NotFilter(Filter):
     """Logical NOT for filter"""
@@ -136,6 +181,13 @@ class NotFilter(Filter):
     def __init__(self, filter_obj: Filter):
         self.filter = filter_obj
     
+    @property
+    def is_sync(self) -> bool:
+        return self.filter.is_sync
+    
+    def check_sync(self, update: Union[Message, Update], bot: Any) -> bool:
+        return not self.filter.check_sync(update, bot)
+    
     async def check(self, update: Union[Message, Update], bot: Any) -> bool:
         return not await self.filter.check(update, bot)
 
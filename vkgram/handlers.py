@@ -1,6 +1,14 @@
+import inspect
 from typing import Callable, Dict, Any, Optional, Union, List
 from .types import Message, Update
-from .filters import Filter, CommandFilter, TextFilter, StateFilter
+from .filters import Filter, CommandFilter, TextFilter, StateFilter, parse_command
+
+async def _call(callback: Callable, *args: Any) -> Any:
+    """Call a sync or async callback, awaiting the result if needed"""
+    result = callback(*args)
+    if inspect.isawaitable(result):
+        return await result
+    return result
 
 class Handler:
     """Base handler class"""
@@ -8,9 +16,21 @@ class Handler:
     def __init__(self, callback: Callable, filters: Optional[List[Filter]] = None):
         self.callback = callback
         self.filters = filters or []
+        self._fast_check: Optional[Callable[[Any, Any], bool]] = None
+    
+    def compile_filters(self):
+        """Fold synchronous filters into a single predicate"""
+        if all(filter_obj.is_sync for filter_obj in self.filters):
+            checks = tuple(filter_obj.check_sync for filter_obj in self.filters)
+            self._fast_check = lambda update, bot: all(check(update, bot) for check in checks)
+        else:
+            self._fast_check = None
     
     async def check(self, update: Union[Message, Update], bot: Any) -> bool:
         """Check if handler should process the update"""
+        if self._fast_check is not None:
+            return self._fast_check(update, bot)
+        
         for filter_obj in self.filters:
             if not await filter_obj.check(update, bot):
                 return False
@@ -25,7 +45,7 @@ class MessageHandler(Handler):
     async def handle(self, message: Message, bot: Any):
         """Handle message"""
         if await self.check(message, bot):
-            return await self.callback(message, bot)
+            return await _call(self.callback, message, bot)
 
 class EventHandler(Handler):
     """Handler for other VK events"""
@@ -37,7 +57,7 @@ class EventHandler(Handler):
     async def handle(self, update: Update, bot: Any):
         """Handle event"""
         if update.type == self.event_type and await self.check(update, bot):
-            return await self.callback(update, bot)
+            return await _call(self.callback, update, bot)
 
 class HandlerManager:
     """Manager for all handlers"""
@@ -45,19 +65,81 @@ class HandlerManager:
     def __init__(self):
         self.message_handlers: List[MessageHandler] = []
         self.event_handlers: List[EventHandler] = []
+        
+        # Command handlers indexed by command name; every list also holds
+        # the handlers without a command filter, in registration order
+        self._plain_handlers: List[MessageHandler] = []
+        self._command_index: Dict[str, List[MessageHandler]] = {}
     
     def register_message_handler(self, handler: MessageHandler):
         """Register message handler"""
+        handler.compile_filters()
         self.message_handlers.append(handler)
+        
+        command_filter = next(
+            (filter_obj for filter_obj in handler.filters if isinstance(filter_obj, CommandFilter)),
+            None
+        )
+        if command_filter is None:
+            self._plain_handlers.append(handler)
+            for handlers in self._command_index.values():
+                handlers.append(handler)
+            return
+        
+        # Index by the filter's own normalized commands so the two can't drift
+        for command in command_filter._commands:
+            self._command_index.setdefault(command, list(self._plain_handlers)).append(handler)
     
     def register_event_handler(self, handler: EventHandler):
         """Register event handler"""
+        handler.compile_filters()
         self.event_handlers.append(handler)
     
-    async def process_message(self, message: Message, bot: Any):
-        """Process message with all registered handlers"""
-        for handler in self.message_handlers:
-            await handler.handle(message, bot)
+    def message_candidates(self, text: str) -> List[MessageHandler]:
+        """Get handlers that can possibly match a message with this text"""
+        command = parse_command(text)
+        if command is None:
+            return self._plain_handlers
+        return self._command_index.get(command, self._plain_handlers)
+    
+    def match_message(
+        self,
+        message: Message,
+        bot: Any,
+        handlers: Optional[List[MessageHandler]] = None
+    ) -> List[MessageHandler]:
+        """Select message handlers using synchronous filters only
+        
+        Handlers with filters that must be awaited are kept and checked
+        later by process_message. ``handlers`` may hold the result of an
+        earlier message_candidates call.
+        """
+        if handlers is None:
+            handlers = self.message_candidates(message.text or "")
+        
+        return [
+            handler for handler in handlers
+            if handler._fast_check is None or handler._fast_check(message, bot)
+        ]
+    
+    async def process_message(
+        self,
+        message: Message,
+        bot: Any,
+        handlers: Optional[List[MessageHandler]] = None
+    ):
+        """Process message with all registered handlers
+        
+        ``handlers`` may hold the result of an earlier match_message call.
+        """
+        if handlers is None:
+            handlers = self.match_message(message, bot)
+        
+        for handler in handlers:
+            if handler._fast_check is None:
+                await handler.handle(message, bot)
+            else:
+                await _call(handler.callback, message, bot)
     
     async def process_event(self, update: Update, bot: Any):
         """Process event with all registered handlers"""
@@ -1,6 +1,9 @@
-import json
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from .types import DATACLASS_SLOTS
+from .utils import json_dumps
 
 class ButtonColor(Enum):
     PRIMARY = "primary"
@@ -8,36 +11,67 @@ class ButtonColor(Enum):
     NEGATIVE = "negative"
     POSITIVE = "positive"
 
+# Frozen so fields can't be reassigned after the payload JSON is computed;
+# the payload dict itself is not copied, so don't mutate it in place.
+# eq=False keeps identity equality and hashing
+@dataclass(frozen=True, eq=False, **DATACLASS_SLOTS)
 class Button:
-    def __init__(
-        self,
-        text: str,
-        color: ButtonColor = ButtonColor.PRIMARY,
-        payload: Optional[Dict] = None
-    ):
-        self.text = text
-        self.color = color
-        self.payload = payload or {}
+    text: str
+    color: ButtonColor = ButtonColor.PRIMARY
+    payload: Optional[Dict] = None
+    _payload_json: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        payload = self.payload or {}
+        object.__setattr__(self, 'payload', payload)
+        object.__setattr__(self, '_payload_json', json_dumps(payload))
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "action": {
                 "type": "text",
                 "label": self.text,
-                "payload": json.dumps(self.payload, ensure_ascii=False)
+                "payload": self._payload_json
             },
             "color": self.color.value
         }
 
 class Keyboard:
     def __init__(self, one_time: bool = False, inline: bool = False):
-        self.one_time = one_time
-        self.inline = inline
-        self.rows = []
+        self._one_time = one_time
+        self._inline = inline
+        self._rows: List[Tuple[Button, ...]] = []
+        self._cached_json: Optional[str] = None
+    
+    # State is only changed through setters and add(), which drop the
+    # cached JSON, so to_json() always reflects the current keyboard
+    @property
+    def one_time(self) -> bool:
+        return self._one_time
+    
+    @one_time.setter
+    def one_time(self, value: bool):
+        self._one_time = value
+        self._cached_json = None
+    
+    @property
+    def inline(self) -> bool:
+        return self._inline
+    
+    @inline.setter
+    def inline(self, value: bool):
+        self._inline = value
+        self._cached_json = None
+    
+    @property
+    def rows(self) -> Tuple[Tuple[Button, ...], ...]:
+        """Read-only view of button rows; use add() to change them"""
+        return tuple(self._rows)
     
     def add(self, *buttons: Button) -> 'Keyboard':
         """Add buttons to a new row"""
-        self.rows.append(list(buttons))
+        self._rows.append(tuple(buttons))
+        self._cached_json = None
         return self
     
     def row(self, *buttons: Button) -> 'Keyboard':
@@ -45,12 +79,17 @@ class Keyboard:
         return self.add(*buttons)
     
     def to_json(self) -> str:
+        # Keyboards are usually reused across many sends, so serialize once
+        if self._cached_json is not None:
+            return self._cached_json
+        
         keyboard_dict = {
-            "one_time": self.one_time,
-            "inline": self.inline,
+            "one_time": self._one_time,
+            "inline": self._inline,
             "buttons": [
                 [button.to_dict() for button in row]
-                for row in self.rows
+                for row in self._rows
             ]
         }
-        return json.dumps(keyboard_dict, ensure_ascii=False)
+        self._cached_json = json_dumps(keyboard_dict)
+        return self._cached_json
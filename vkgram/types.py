@@ -1,15 +1,24 @@
+import sys
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, FrozenSet, Optional
 
-@dataclass
+# dataclass(slots=True) is only supported on Python 3.10+
+DATACLASS_SLOTS: Dict[str, bool] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class User:
     id: int
     first_name: str
     last_name: str
     is_admin: bool = False
 
-@dataclass
-class Message:
+class _MessageCache:
+    """Lazily computed Message data kept outside the dataclass fields"""
+    
+    __slots__ = ('_attachment_types',)
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class Message(_MessageCache):
     id: int
     from_id: int
     peer_id: int
@@ -22,8 +31,18 @@ class Message:
     @property
     def chat_id(self) -> int:
         return self.peer_id
+    
+    @property
+    def attachment_types(self) -> FrozenSet[str]:
+        """Types of all attachments, computed on first access"""
+        try:
+            return self._attachment_types
+        except AttributeError:
+            types = frozenset(attachment.get('type') for attachment in self.attachments)
+            object.__setattr__(self, '_attachment_types', types)
+            return types
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class Update:
     type: str
     object: Dict[str, Any]
@@ -1,77 +1,145 @@
 import asyncio
 import aiohttp
+import heapq
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
-from datetime import datetime, timedelta
+import re
+import time
+from collections import OrderedDict
+from itertools import cycle
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Prefer orjson, then ujson where orjson wheels are unavailable, then json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ujson = None
+if orjson is None:
+    try:
+        import ujson
+    except ImportError:
+        pass
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON from str or raw bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj: Any) -> str:
+    """Encode JSON keeping non-ASCII characters as is"""
+    if orjson is not None:
+        # stdlib json accepts int/float/bool/None dict keys, keep parity
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    if ujson is not None:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+    return json.dumps(obj, ensure_ascii=False)
 
 class RateLimiter:
-    """Rate limiter for VK API calls"""
+    """Token bucket rate limiter for VK API calls
+    
+    Must be used from a single event loop: the refill-and-take step has no
+    await inside, so it runs atomically without a lock.
+    
+    Time is kept in integer nanoseconds. Credits are measured so that one
+    request costs ``period_ns`` and every elapsed nanosecond adds
+    ``max_requests``, which keeps all arithmetic exact.
+    
+    The bucket holds at most one request, so calls are spaced at least
+    ``period / max_requests`` apart and no ``period`` window ever sees
+    more than ``max_requests`` calls, matching VK's per-second limit.
+    """
+    
+    __slots__ = ('max_requests', 'period', 'period_ns', 'capacity', 'credits', 'last_refill')
     
     def __init__(self, max_requests: int = 3, period: float = 1.0):
         self.max_requests = max_requests
         self.period = period
-        self.requests = []
-        self.lock = asyncio.Lock()
+        self.period_ns = int(period * 1_000_000_000)
+        # A larger burst plus refill would exceed max_requests per period
+        self.capacity = self.period_ns
+        self.credits = self.capacity
+        self.last_refill: Optional[int] = None
     
     async def acquire(self):
         """Acquire a rate limit slot"""
-        async with self.lock:
-            now = asyncio.get_event_loop().time()
+        while True:
+            now = time.monotonic_ns()
             
-            # Remove old requests
-            self.requests = [req_time for req_time in self.requests 
-                           if now - req_time < self.period]
+            # Refill credits for the time passed since the last call
+            if self.last_refill is not None:
+                self.credits = min(
+                    self.capacity,
+                    self.credits + (now - self.last_refill) * self.max_requests
+                )
+            self.last_refill = now
             
-            if len(self.requests) >= self.max_requests:
-                # Wait until the oldest request expires
-                wait_time = self.period - (now - self.requests[0])
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
-                self.requests.pop(0)
+            if self.credits >= self.period_ns:
+                self.credits -= self.period_ns
+                return
             
-            self.requests.append(now)
+            # Wait until one full request is available, then re-check
+            wait_ns = -(-(self.period_ns - self.credits) // self.max_requests)
+            await asyncio.sleep(wait_ns / 1_000_000_000)
 
 class APIUtils:
     """Utility methods for VK API"""
     
+    @staticmethod
+    def _format_attachment(attachment: Dict) -> Optional[str]:
+        """Format single attachment, or None if it is incomplete"""
+        get = attachment.get
+        attach_type, owner_id, media_id = get('type'), get('owner_id'), get('id')
+        if not (attach_type and owner_id and media_id):
+            return None
+        
+        access_key = get('access_key')
+        if access_key:
+            return f"{attach_type}{owner_id}_{media_id}_{access_key}"
+        return f"{attach_type}{owner_id}_{media_id}"
+    
     @staticmethod
     def prepare_attachments(attachments: List[Dict]) -> str:
         """Convert attachments to VK API format"""
         if not attachments:
             return ""
         
-        result = []
-        for attachment in attachments:
-            if isinstance(attachment, dict):
-                attach_type = attachment.get('type', '')
-                owner_id = attachment.get('owner_id', '')
-                media_id = attachment.get('id', '')
-                access_key = attachment.get('access_key', '')
-                
-                if attach_type and owner_id and media_id:
-                    attach_str = f"{attach_type}{owner_id}_{media_id}"
-                    if access_key:
-                        attach_str += f"_{access_key}"
-                    result.append(attach_str)
-        
-        return ",".join(result)
+        format_attachment = APIUtils._format_attachment
+        formatted = (
+            format_attachment(attachment) for attachment in attachments
+            if isinstance(attachment, dict)
+        )
+        return ",".join(attach_str for attach_str in formatted if attach_str)
     
     @staticmethod
-    def parse_message_payload(payload: Optional[str]) -> Dict[str, Any]:
-        """Parse message payload from JSON string"""
+    def parse_message_payload(payload: Optional[Union[str, bytes]]) -> Dict[str, Any]:
+        """Parse message payload from JSON string or bytes"""
         if not payload:
             return {}
         
         try:
-            return json.loads(payload)
-        except (json.JSONDecodeError, TypeError):
+            return json_loads(payload)
+        except (ValueError, TypeError):
             return {}
     
     @staticmethod
     def build_payload(**kwargs) -> str:
         """Build payload JSON string"""
-        return json.dumps(kwargs, ensure_ascii=False)
+        return json_dumps(kwargs)
+
+# vkgram.keyboard imports this module, so it is loaded on first use
+_keyboard_module = None
+
+def _get_keyboard_module():
+    global _keyboard_module
+    if _keyboard_module is None:
+        from . import keyboard
+        _keyboard_module = keyboard
+    return _keyboard_module
 
 class KeyboardUtils:
     """Utilities for keyboard creation"""
@@ -79,7 +147,8 @@ class KeyboardUtils:
     @staticmethod
     def quick_reply(*buttons: str, one_time: bool = True) -> 'Keyboard':
         """Create quick reply keyboard"""
-        from .keyboard import Keyboard, Button, ButtonColor
+        kb_module = _get_keyboard_module()
+        Keyboard, Button, ButtonColor = kb_module.Keyboard, kb_module.Button, kb_module.ButtonColor
         
         kb = Keyboard(one_time=one_time)
         for button_text in buttons:
@@ -90,7 +159,8 @@ class KeyboardUtils:
     @staticmethod
     def inline_grid(buttons: List[List[str]], colors: List['ButtonColor'] = None) -> 'Keyboard':
         """Create inline keyboard grid"""
-        from .keyboard import Keyboard, Button, ButtonColor
+        kb_module = _get_keyboard_module()
+        Keyboard, Button, ButtonColor = kb_module.Keyboard, kb_module.Button, kb_module.ButtonColor
         
         kb = Keyboard(inline=True)
         default_colors = [ButtonColor.PRIMARY, ButtonColor.SECONDARY, 
@@ -99,74 +169,145 @@ class KeyboardUtils:
         colors = colors or default_colors
         
         for row in buttons:
-            row_buttons = []
-            for i, text in enumerate(row):
-                color = colors[i % len(colors)]
-                row_buttons.append(Button(text, color))
-            kb.add(*row_buttons)
+            # Colors restart from the first one on every row
+            row_colors = cycle(colors)
+            kb.add(*[Button(text, next(row_colors)) for text in row])
         
         return kb
 
+# Matches every Markdown special character
+_MARKDOWN_SPECIAL_RE = re.compile(r'[_*\[\]()~`>#+\-=|{}.!]')
+
+def _escape_markdown_match(match: 're.Match') -> str:
+    return '\\' + match.group()
+
+_DEFAULT_TRUNCATE_SUFFIX = "..."
+_DEFAULT_TRUNCATE_SUFFIX_LENGTH = len(_DEFAULT_TRUNCATE_SUFFIX)
+
 class TextUtils:
     """Text formatting utilities"""
     
     @staticmethod
     def escape_markdown(text: str) -> str:
         """Escape Markdown characters"""
-        escape_chars = r'_*[]()~`>#+-=|{}.!'
-        for char in escape_chars:
-            text = text.replace(char, f'\\{char}')
-        return text
+        return _MARKDOWN_SPECIAL_RE.sub(_escape_markdown_match, text)
     
     @staticmethod
-    def truncate_text(text: str, max_length: int = 4096, suffix: str = "...") -> str:
+    def truncate_text(text: str, max_length: int = 4096, suffix: str = _DEFAULT_TRUNCATE_SUFFIX) -> str:
         """Truncate text to maximum length"""
         if len(text) <= max_length:
             return text
         
-        return text[:max_length - len(suffix)] + suffix
+        suffix_length = _DEFAULT_TRUNCATE_SUFFIX_LENGTH if suffix is _DEFAULT_TRUNCATE_SUFFIX else len(suffix)
+        return text[:max_length - suffix_length] + suffix
+
+# Shortest pause between two expiry sweeps, in seconds
+_MIN_SWEEP_INTERVAL = 1.0
 
 class Cache:
     """Simple async cache implementation"""
     
-    def __init__(self, default_ttl: int = 300):
-        self._cache = {}
+    __slots__ = (
+        '_values', '_expires', '_expiry_heap', 'default_ttl', 'max_size', '_lock',
+        '_sweeper', '_sweeper_wakeup'
+    )
+    
+    def __init__(self, default_ttl: int = 300, max_size: int = 10000):
+        # Values are kept in least-recently-used order
+        self._values: "OrderedDict[str, Any]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
         self.default_ttl = default_ttl
+        self.max_size = max_size
         self._lock = asyncio.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._sweeper_wakeup = asyncio.Event()
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """Set cache value"""
         async with self._lock:
-            expire_time = datetime.now() + timedelta(seconds=ttl or self.default_ttl)
-            self._cache[key] = (value, expire_time)
+            expire_time = time.monotonic() + (ttl or self.default_ttl)
+            if key in self._values:
+                self._values.move_to_end(key)
+            self._values[key] = value
+            self._expires[key] = expire_time
+            
+            if len(self._values) > self.max_size:
+                oldest_key, _ = self._values.popitem(last=False)
+                del self._expires[oldest_key]
+            
+            # Overwritten and evicted keys leave stale heap records behind
+            if len(self._expiry_heap) > 2 * len(self._expires):
+                self._expiry_heap = [(expire, key) for key, expire in self._expires.items()]
+                heapq.heapify(self._expiry_heap)
+            heapq.heappush(self._expiry_heap, (expire_time, key))
+            
+            # Let a sleeping sweeper reschedule for the new earliest deadline
+            if self._expiry_heap[0] == (expire_time, key):
+                self._sweeper_wakeup.set()
+        
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_periodically())
     
     async def get(self, key: str, default: Any = None) -> Any:
         """Get cache value"""
-        async with self._lock:
-            if key not in self._cache:
-                return default
-            
-            value, expire_time = self._cache[key]
-            if datetime.now() > expire_time:
-                del self._cache[key]
-                return default
-            
-            return value
+        # No await below, so the read can't interleave with a locked write
+        expire_time = self._expires.get(key)
+        if expire_time is None:
+            return default
+        
+        if time.monotonic() > expire_time:
+            del self._expires[key]
+            del self._values[key]
+            return default
+        
+        self._values.move_to_end(key)
+        return self._values[key]
     
     async def delete(self, key: str):
         """Delete cache value"""
         async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
+            if key in self._expires:
+                del self._expires[key]
+                del self._values[key]
     
     async def clear(self):
         """Clear all cache"""
         async with self._lock:
-            self._cache.clear()
+            self._values.clear()
+            self._expires.clear()
+            self._expiry_heap.clear()
+    
+    async def _sweep_periodically(self):
+        """Drop expired values until nothing is left to expire"""
+        while self._expiry_heap:
+            # Wake at the next deadline, but never spin on tiny TTLs
+            delay = self._expiry_heap[0][0] - time.monotonic()
+            self._sweeper_wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._sweeper_wakeup.wait(), timeout=max(delay, _MIN_SWEEP_INTERVAL)
+                )
+            except asyncio.TimeoutError:
+                await self._sweep()
+    
+    async def _sweep(self):
+        """Drop values whose expiry time has passed"""
+        async with self._lock:
+            now = time.monotonic()
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expire_time, key = heapq.heappop(self._expiry_heap)
+                
+                # Heap records of overwritten or deleted keys are stale
+                if self._expires.get(key) == expire_time:
+                    del self._expires[key]
+                    del self._values[key]
 
 class Logger:
     """Enhanced logger for VKgram"""
     
+    __slots__ = ('logger',)
+    
     def __init__(self, name: str = "vkgram"):
         self.logger = logging.getLogger(name)
     
@@ -175,13 +316,20 @@ class Logger:
         update_type = update.get('type', 'unknown')
         
         if update_type == 'message_new':
+            if not self.logger.isEnabledFor(logging.INFO):
+                return
+            
             message = update.get('object', {}).get('message', {})
+            from_id = message.get('from_id')
+            text = message.get('text') or ''
             self.logger.info(
-                f"📨 Message from {message.get('from_id')}: "
-                f"{message.get('text', '').strip() or '<no text>'}"
+                "📨 Message from %s: %s",
+                from_id,
+                text.strip() or '<no text>',
+                extra={'update_type': update_type, 'from_id': from_id, 'text': text}
             )
-        else:
-            self.logger.debug(f"📢 Event: {update_type}")
+        elif self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("📢 Event: %s", update_type, extra={'update_type': update_type})
 
 # Global instances
 rate_limiter = RateLimiter()